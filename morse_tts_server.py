@@ -1,11 +1,42 @@
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request, Response
-from pydantic import BaseModel, Field
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
 import numpy as np
-import wave
-import io
+import inspect
+import json
+import logging
 import math
 import time
+import asyncio
+import struct
+import threading
+from collections import OrderedDict
+
+# Numba is optional: when available, waveform assembly runs in a compiled
+# kernel; otherwise a pure-numpy fallback path is used.
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+# orjson is optional too: when available, it parses request bodies and
+# serializes JSON responses in place of the stdlib json module.
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+    _json_loads = orjson.loads
+    _JSON_RESPONSE_CLASS = ORJSONResponse
+except ImportError:
+    from fastapi.responses import JSONResponse
+    _json_loads = json.loads
+    _JSON_RESPONSE_CLASS = JSONResponse
+
+# Per-request logging is routed through the logging module with lazy
+# %-formatting, so suppressed levels cost no string building and nothing
+# serializes on the stdout lock under load.
+logger = logging.getLogger("morse_tts")
 
 # --- Morse Code Logic (Adapted from jscwlib) ---
 
@@ -32,6 +63,67 @@ FREQUENCY = 600      # Morse tone frequency in Hz
 AMPLITUDE = 0.5      # Volume (0.0 to 1.0)
 BASE_WPM = 20        # Default WPM if speed is 1.0 OR if voice not mapped
 
+# Per-model sample rates. The tone is band-limited to FREQUENCY (600 Hz),
+# so the 8 kHz variant is comfortably above Nyquist and produces ~5.5x
+# smaller output for bandwidth-sensitive clients.
+MODEL_SAMPLE_RATES = {
+    "morse-code":    SAMPLE_RATE,
+    "morse-code-8k": 8000,
+}
+
+# Precomputed two-second master tone at the default frequency/sample rate/
+# amplitude, stored as 16-bit PCM so the whole render pipeline works on
+# 2-byte samples. The tone always starts at phase 0, so dot and dah
+# waveforms are simply prefixes of this table — no per-request
+# transcendental work for the common settings. Two seconds covers the dah
+# (3 * 1.2/wpm seconds) for every WPM down to 1.8; slower still falls back
+# to computing directly.
+_TONE_TABLE_SECONDS = 2
+
+def _build_tone_table(freq: int, sample_rate: int, amplitude: float) -> np.ndarray:
+    """Computes the sine once for a full table; all tones slice prefixes.
+
+    The ufunc chain runs in place on a single float buffer, so building a
+    table allocates one float array plus the int16 result instead of a
+    fresh temporary per operation.
+    """
+    n = _TONE_TABLE_SECONDS * sample_rate
+    table = np.arange(n, dtype=np.float64)
+    np.multiply(table, 2 * np.pi * freq, out=table)
+    np.divide(table, sample_rate, out=table)
+    np.sin(table, out=table)
+    np.multiply(table, amplitude * 32767, out=table)
+    np.rint(table, out=table)
+    return table.astype(np.int16)
+
+_TONE_TABLE = _build_tone_table(FREQUENCY, SAMPLE_RATE, AMPLITUDE)
+
+# Non-default parameter sets (e.g. the 8 kHz model) get their own table on
+# first use; only a handful of (freq, sample_rate, amplitude) combinations
+# ever occur, one per configured model/sample rate.
+_TONE_CACHE = {(FREQUENCY, SAMPLE_RATE, AMPLITUDE): _TONE_TABLE}
+
+def _tone(n_samples: int, freq: int, sample_rate: int, amplitude: float) -> np.ndarray:
+    """Returns the first n_samples of the int16 PCM tone, as a view of the
+    precomputed table for the given parameter set."""
+    key = (freq, sample_rate, amplitude)
+    table = _TONE_CACHE.get(key)
+    if table is None:
+        table = _build_tone_table(freq, sample_rate, amplitude)
+        _TONE_CACHE[key] = table
+    if n_samples <= table.size:
+        return table[:n_samples]
+    # Tones longer than the table (extremely low WPM): compute the sine once
+    # for the full dah here, with the same in-place chain; callers slice the
+    # dot as a prefix view of it
+    t = np.arange(n_samples, dtype=np.float64)
+    np.multiply(t, 2 * np.pi * freq, out=t)
+    np.divide(t, sample_rate, out=t)
+    np.sin(t, out=t)
+    np.multiply(t, amplitude * 32767, out=t)
+    np.rint(t, out=t)
+    return t.astype(np.int16)
+
 # --- Voice to WPM Mapping ---
 # Map desired "voice" names to specific WPM settings.
 # Use lowercase keys for case-insensitive matching.
@@ -51,23 +143,207 @@ VOICE_WPM_MAP = {
 app = FastAPI(
     title="Morse Code TTS Server",
     description="A server mimicking OpenAI TTS API to generate Morse code audio. Uses 'voice' to select WPM.",
+    default_response_class=_JSON_RESPONSE_CLASS,
 )
+# Silence-heavy PCM compresses extremely well, so offer gzip to clients
+# that negotiate it. Newer Starlette skips audio/* by default — sensible
+# for already-compressed codecs, but uncompressed WAV is exactly the
+# payload gzip helps with, so lift that exclusion where supported.
+if "exclude_content_types" in inspect.signature(GZipMiddleware.__init__).parameters:
+    from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
+    app.add_middleware(
+        GZipMiddleware, minimum_size=1024,
+        exclude_content_types=tuple(t for t in DEFAULT_EXCLUDED_CONTENT_TYPES if t != "audio/*"),
+    )
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# --- Request Parsing (Matching OpenAI TTS API structure) ---
+# The request schema is tiny (model, input, voice, response_format, speed),
+# so the body is parsed and validated by hand: running the full Pydantic
+# machinery per request costs more than rendering short inputs does.
+def _parse_speech_request(raw: bytes) -> dict:
+    """Parses and validates a /v1/audio/speech request body."""
+    try:
+        payload = _json_loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be valid JSON.")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=422, detail="Request body must be a JSON object.")
+
+    text = payload.get("input")
+    if not isinstance(text, str):
+        raise HTTPException(status_code=422, detail="'input' is required and must be a string.")
+
+    model = payload.get("model", "morse-code")
+    if not isinstance(model, str):
+        raise HTTPException(status_code=422, detail="'model' must be a string.")
+
+    voice = payload.get("voice", "echo")
+    if not isinstance(voice, str):
+        raise HTTPException(status_code=422, detail="'voice' must be a string.")
+
+    speed = payload.get("speed", 1.0)
+    if isinstance(speed, bool) or not isinstance(speed, (int, float)):
+        raise HTTPException(status_code=422, detail="'speed' must be a number.")
+    # NaN slips through the clamp below (its comparisons are all false) and
+    # the stdlib json fallback accepts it, so reject non-finite values here.
+    if not math.isfinite(speed):
+        raise HTTPException(status_code=422, detail="'speed' must be a finite number.")
+    # Clamp to the supported range instead of rejecting
+    speed = min(max(float(speed), 0.25), 4.0)
+
+    return {
+        "model": model, # Selects the sample rate, otherwise always morse
+        "input": text,
+        "voice": voice,
+        "speed": speed,
+    }
+
+# --- Symbol Stream Encoding ---
+# The text is first encoded as a flat stream of small integer codes (tones
+# and gaps). Both renderers below consume this stream, so all of the gap
+# bookkeeping lives in one place.
+SYM_DOT = 0       # Dot tone
+SYM_DAH = 1       # Dah tone
+SYM_INTRA = 2     # Gap between symbols within a character
+SYM_CHAR_GAP = 3  # Additional gap between characters (beyond the intra gap)
+SYM_WORD_GAP = 4  # Additional gap between words (beyond the intra gap)
+
+# 128-entry lookup table indexed by ASCII code: row = [n_symbols, s0..s6]
+# with s in {SYM_DOT, SYM_DAH}. n_symbols is -1 for unmapped codes and 0 for
+# the space character (word gap). Translating text through this table avoids
+# the per-character dict lookup and per-symbol string iteration.
+_MORSE_LUT = np.full((128, 8), -1, dtype=np.int8)
+for _char, _pattern in MORSE_CODE_DICT.items():
+    if _char == ' ':
+        _MORSE_LUT[ord(_char), 0] = 0
+        continue
+    _MORSE_LUT[ord(_char), 0] = len(_pattern)
+    for _i, _symbol in enumerate(_pattern):
+        _MORSE_LUT[ord(_char), 1 + _i] = SYM_DOT if _symbol == '.' else SYM_DAH
+
+def _build_char_symbols():
+    """Prebuilds, per ASCII code, the character's symbol chunk (tones with
+    intra-symbol gaps and the trailing gap), with and without the leading
+    inter-character gap."""
+    plain = [None] * 128
+    gapped = [None] * 128
+    for code in range(128):
+        n_symbols = int(_MORSE_LUT[code, 0])
+        if n_symbols <= 0:
+            continue
+        symbols = []
+        for s in _MORSE_LUT[code, 1:1 + n_symbols]:
+            if symbols:
+                symbols.append(SYM_INTRA)
+            symbols.append(int(s))
+        # Final intra-symbol gap after the last symbol of the character
+        symbols.append(SYM_INTRA)
+        plain[code] = np.array(symbols, dtype=np.int8)
+        gapped[code] = np.array([SYM_CHAR_GAP] + symbols, dtype=np.int8)
+    return plain, gapped
+
+_CHAR_SYMBOLS, _CHAR_SYMBOLS_GAPPED = _build_char_symbols()
+_WORD_GAP_CHUNK = np.array([SYM_WORD_GAP], dtype=np.int8)
+
+def _encode_symbol_chunks(text: str) -> list:
+    """Encodes text as per-character int8 arrays of tone/gap symbol codes.
+
+    Each chunk carries its own leading inter-character/word gap, so the
+    concatenation of all chunks is the full symbol stream and each chunk can
+    also be rendered (and streamed) on its own. Chunks are shared prebuilt
+    arrays and must not be mutated.
+    """
+    upper = text.upper()
+    try:
+        codes = np.frombuffer(upper.encode('ascii'), dtype=np.uint8)
+    except UnicodeEncodeError:
+        # Map non-ASCII characters to DEL, which has no Morse entry
+        codes = np.array([min(ord(c), 0x7F) for c in upper], dtype=np.uint8)
 
-# --- Request Model (Matching OpenAI TTS API structure) ---
-class SpeechRequest(BaseModel):
-    model: str = Field(default="morse-code", description="Model name (ignored, always morse)")
-    input: str = Field(..., description="The text to convert to Morse code speech")
-    voice: str = Field(default="echo", description="Selects WPM based on VOICE_WPM_MAP: alloy, echo, fable, onyx, nova, shimmer, or custom")
-    response_format: str = Field(default="wav", description="Audio format (only wav supported)")
-    speed: float = Field(default=1.0, ge=0.25, le=4.0, description="Speed multiplier (Used ONLY if voice is not mapped in VOICE_WPM_MAP)")
+    # One vectorized gather resolves every character's symbol count
+    char_lengths = _MORSE_LUT[codes, 0]
+    for i in np.flatnonzero(char_lengths < 0):
+        logger.warning("Character '%s' not found in Morse dictionary. Skipping.", upper[i])
 
-# --- Morse Audio Generation Function ---
-def generate_morse_wav(text: str, wpm: float, freq: int, sample_rate: int, amplitude: float) -> bytes:
-    """Generates WAV audio bytes for the given text in Morse code."""
+    chunks = []
+    first_char = True
+    for code, n_symbols in zip(codes, char_lengths):
+        if n_symbols < 0:
+            continue # Skip characters not in the dictionary
 
-    # This function remains the same as before, it just uses the 'wpm' value passed to it.
-    if wpm <= 0:
-        wpm = BASE_WPM # Prevent division by zero or negative speeds
+        # The gap *before* each character/word is the *additional* silence
+        # needed after the previous char's intra-symbol gap.
+        if n_symbols == 0: # Word gap
+            if first_char:
+                first_char = False
+            else:
+                chunks.append(_WORD_GAP_CHUNK)
+            continue
+
+        if first_char:
+            chunks.append(_CHAR_SYMBOLS[code])
+            first_char = False
+        else:
+            chunks.append(_CHAR_SYMBOLS_GAPPED[code])
+
+    return chunks
+
+def _encode_symbols(text: str) -> np.ndarray:
+    """Encodes text as one flat int8 stream of tone/gap symbol codes."""
+    chunks = _encode_symbol_chunks(text)
+    if not chunks:
+        return np.empty(0, dtype=np.int8)
+    return np.concatenate(chunks)
+
+# --- Waveform Renderers ---
+# Both renderers write tones into a zero-initialized output buffer at a
+# running offset; gap codes simply advance the offset. Tone samples come
+# from the precomputed PCM table: dot and dah both start at phase 0, so the
+# dah waveform doubles as the lookup table for both (the dot is its prefix)
+# and no transcendental work happens per sample.
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _render_symbols(symbols, lengths, tone, out):
+        pos = 0
+        for k in range(symbols.size):
+            code = symbols[k]
+            n = lengths[code]
+            if code == SYM_DOT or code == SYM_DAH:
+                for i in range(n):
+                    out[pos + i] = tone[i]
+            pos += n
+
+def _render_symbols_numpy(symbols, lengths, dot_wave, dah_wave, out):
+    pos = 0
+    for code in symbols:
+        n = lengths[code]
+        if code == SYM_DOT:
+            out[pos:pos + n] = dot_wave
+        elif code == SYM_DAH:
+            out[pos:pos + n] = dah_wave
+        pos += n
+
+# --- Per-WPM Timing Cache ---
+# The same handful of WPM values from VOICE_WPM_MAP recurs constantly, so
+# the per-symbol-code sample lengths are computed once per
+# (wpm, sample_rate) pair and reused across requests. The WPM can also be
+# an arbitrary client float (BASE_WPM * speed for unmapped voices), so the
+# cache is bounded like the others; entries are tiny, an entry cap is
+# enough. Like the WAV cache, this only runs on the event loop.
+_WPM_CACHE: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_WPM_CACHE_MAX_ENTRIES = 256
+
+def _get_tables(wpm: float, sample_rate: int) -> np.ndarray:
+    """Returns the samples contributed by each symbol code (indexed by
+    SYM_* value) for the given WPM, cached across requests."""
+    key = (wpm, sample_rate)
+    lengths = _WPM_CACHE.get(key)
+    if lengths is not None:
+        _WPM_CACHE.move_to_end(key)
+        return lengths
 
     # Timing (based on PARIS standard)
     dot_duration_sec = 1.2 / wpm
@@ -76,158 +352,248 @@ def generate_morse_wav(text: str, wpm: float, freq: int, sample_rate: int, ampli
     inter_char_gap_sec = 3 * dot_duration_sec # Gap between characters in a word
     word_gap_sec = 7 * dot_duration_sec       # Gap between words
 
-    # Convert durations to samples
-    dot_samples = int(sample_rate * dot_duration_sec)
-    dah_samples = int(sample_rate * dah_duration_sec)
-    intra_symbol_gap_samples = int(sample_rate * intra_symbol_gap_sec)
-    # Note: The actual silence added between chars/words below accounts for the
+    # Convert durations to samples.
+    # Note: The actual silence added between chars/words accounts for the
     # intra_symbol_gap already added after the last symbol.
-    inter_char_additional_silence_samples = int(sample_rate * (inter_char_gap_sec - intra_symbol_gap_sec))
-    word_additional_silence_samples = int(sample_rate * (word_gap_sec - intra_symbol_gap_sec))
-
-
-    # Generate basic waveforms
-    t_dot = np.linspace(0., dot_duration_sec, dot_samples, endpoint=False)
-    t_dah = np.linspace(0., dah_duration_sec, dah_samples, endpoint=False)
-
-    dot_wave = (amplitude * np.sin(2 * np.pi * freq * t_dot)).astype(np.float32)
-    dah_wave = (amplitude * np.sin(2 * np.pi * freq * t_dah)).astype(np.float32)
-
-    # Silence waveforms
-    intra_symbol_silence = np.zeros(intra_symbol_gap_samples, dtype=np.float32)
-    # Pre-calculate additional silence needed beyond the intra-symbol gap
-    inter_char_additional_silence = np.zeros(inter_char_additional_silence_samples, dtype=np.float32)
-    word_additional_silence = np.zeros(word_additional_silence_samples, dtype=np.float32)
-
-
-    audio_segments = []
-    first_char = True
-
-    for char in text.upper():
-        morse_pattern = MORSE_CODE_DICT.get(char)
-
-        if morse_pattern is None:
-            print(f"Warning: Character '{char}' not found in Morse dictionary. Skipping.")
-            continue # Skip characters not in the dictionary
-
-        # Add inter-character or word gap *before* the next character/word
-        # This gap is the *additional* silence needed after the previous char's intra-symbol gap
-        if not first_char:
-            if char == ' ':
-                # Add word gap (additional silence)
-                if word_additional_silence.size > 0:
-                     audio_segments.append(word_additional_silence)
-            else:
-                 # Add inter-character gap (additional silence)
-                 if inter_char_additional_silence.size > 0:
-                      audio_segments.append(inter_char_additional_silence)
-        else:
-            first_char = False
-
-
-        if char == ' ':
-            continue # Already handled gap before the *next* word
+    lengths = np.array([
+        int(sample_rate * dot_duration_sec),
+        int(sample_rate * dah_duration_sec),
+        int(sample_rate * intra_symbol_gap_sec),
+        int(sample_rate * (inter_char_gap_sec - intra_symbol_gap_sec)),
+        int(sample_rate * (word_gap_sec - intra_symbol_gap_sec)),
+    ], dtype=np.int64)
+    _WPM_CACHE[key] = lengths
+    while len(_WPM_CACHE) > _WPM_CACHE_MAX_ENTRIES:
+        _WPM_CACHE.popitem(last=False)
+    return lengths
+
+def _render_pcm(symbols, lengths, freq, sample_rate, amplitude) -> np.ndarray:
+    """Renders a symbol stream to an int16 PCM sample buffer.
+
+    The single np.zeros call here is the only allocation: silence is never
+    materialized as separate arrays or copied in, the renderers just skip
+    over the gap spans of the zero-initialized buffer. For typical messages
+    gaps are roughly 40% of the samples, so they cost no memory writes.
+    """
+    total_samples = int(lengths[symbols].sum())
 
-        # Generate audio for the character's Morse pattern
-        first_symbol = True
-        for symbol in morse_pattern:
-            # Add intra-symbol gap before the next symbol within the char
-            if not first_symbol:
-                if intra_symbol_silence.size > 0:
-                     audio_segments.append(intra_symbol_silence)
-            else:
-                first_symbol = False
+    audio = np.zeros(total_samples, dtype=np.int16)
 
-            if symbol == '.':
-                audio_segments.append(dot_wave)
-            elif symbol == '-':
-                audio_segments.append(dah_wave)
+    dah_wave = _tone(int(lengths[SYM_DAH]), freq, sample_rate, amplitude)
+    if HAVE_NUMBA:
+        _render_symbols(symbols, lengths, dah_wave, audio)
+    else:
+        dot_wave = dah_wave[:int(lengths[SYM_DOT])]
+        _render_symbols_numpy(symbols, lengths, dot_wave, dah_wave, audio)
+
+    return audio
+
+# --- Per-Character PCM Cache ---
+# Specialization by character: each distinct symbol chunk (a letter with its
+# leading gap, or a word gap) is rendered once per audio-parameter set and
+# the PCM bytes are reused for every later occurrence, in this request and
+# all following ones. Chunks are at most 14 codes, so keys stay tiny.
+# Eviction is bounded by total byte size as well as entry count: at low
+# WPMs a single chunk's PCM runs to hundreds of KB, and every distinct
+# speed value mints new entries for the same letters.
+_CHUNK_PCM_CACHE: "OrderedDict[tuple, bytes]" = OrderedDict()
+_CHUNK_PCM_CACHE_MAX_ENTRIES = 1024
+_CHUNK_PCM_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_chunk_pcm_cache_size = 0
+# Unlike the WAV cache helpers, which only ever run on the event loop,
+# this function runs on default-executor threads and needs a lock around
+# every cache mutation. Rendering itself stays outside the lock.
+_chunk_pcm_cache_lock = threading.Lock()
+
+def _render_chunk_cached(chunk, lengths, freq, sample_rate, amplitude) -> bytes:
+    """Renders one symbol chunk to PCM bytes, memoized per parameter set."""
+    global _chunk_pcm_cache_size
+
+    # The key must carry the full timing table: nearby WPMs can share a dot
+    # sample count while differing in dah/gap counts, and a collision would
+    # serve PCM rendered with the wrong durations.
+    key = (chunk.tobytes(), lengths.tobytes(), freq, sample_rate, amplitude)
+    with _chunk_pcm_cache_lock:
+        data = _CHUNK_PCM_CACHE.get(key)
+        if data is not None:
+            _CHUNK_PCM_CACHE.move_to_end(key)
+            return data
+
+    data = _render_pcm(chunk, lengths, freq, sample_rate, amplitude).tobytes()
+
+    with _chunk_pcm_cache_lock:
+        # Another thread may have rendered and inserted the same key while
+        # this one held no lock; only count the bytes actually stored.
+        if key not in _CHUNK_PCM_CACHE:
+            _CHUNK_PCM_CACHE[key] = data
+            _chunk_pcm_cache_size += len(data)
+        while _CHUNK_PCM_CACHE and (len(_CHUNK_PCM_CACHE) > _CHUNK_PCM_CACHE_MAX_ENTRIES
+                                    or _chunk_pcm_cache_size > _CHUNK_PCM_CACHE_MAX_BYTES):
+            _, evicted = _CHUNK_PCM_CACHE.popitem(last=False)
+            _chunk_pcm_cache_size -= len(evicted)
+    return data
+
+# --- WAV Packaging ---
+def _wav_header(n_samples: int, sample_rate: int) -> bytes:
+    """Builds the 44-byte RIFF/fmt/data header for mono 16-bit PCM."""
+    data_size = n_samples * 2
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16,
+        1,                # PCM format
+        1,                # Mono
+        sample_rate,
+        sample_rate * 2,  # Byte rate
+        2,                # Block align
+        16,               # Bits per sample
+        b'data', data_size,
+    )
 
-        # Add the final intra-symbol gap after the last symbol of the character
-        if intra_symbol_silence.size > 0:
-             audio_segments.append(intra_symbol_silence)
+# --- Morse Audio Generation Function ---
+def generate_morse_wav(text: str, wpm: float, freq: int, sample_rate: int, amplitude: float) -> bytes:
+    """Generates WAV audio bytes for the given text in Morse code."""
 
+    # This function remains the same as before, it just uses the 'wpm' value passed to it.
+    if wpm <= 0:
+        wpm = BASE_WPM # Prevent division by zero or negative speeds
 
-    if not audio_segments:
+    symbols = _encode_symbols(text)
+    if symbols.size == 0:
         # Handle empty input or input with only unknown chars
-         return b''
-
-    # Combine all segments
-    full_audio = np.concatenate(audio_segments)
-
-    # Convert to 16-bit PCM WAV format
-    scaled_audio = (full_audio * 32767).astype(np.int16)
-
-    # Write to in-memory WAV file
-    buffer = io.BytesIO()
-    with wave.open(buffer, 'wb') as wf:
-        wf.setnchannels(1)  # Mono
-        wf.setsampwidth(2)  # 16 bits per sample (2 bytes)
-        wf.setframerate(sample_rate)
-        wf.writeframes(scaled_audio.tobytes())
-
-    buffer.seek(0)
-    return buffer.read()
+        return b''
+
+    lengths = _get_tables(wpm, sample_rate)
+    if int(lengths[symbols].sum()) == 0:
+        return b''
+
+    # Samples are rendered as 16-bit PCM directly; the WAV container for
+    # fixed mono/16-bit output is just a 44-byte header in front of them.
+    full_audio = _render_pcm(symbols, lengths, freq, sample_rate, amplitude)
+
+    return _wav_header(full_audio.size, sample_rate) + full_audio.tobytes()
+
+# --- Rendered WAV Cache ---
+# Many TTS clients repeat identical requests (health checks, test suites,
+# chat retries). Fully rendered WAV bytes are cached LRU-style so repeats
+# skip the render path entirely. Eviction is bounded both by entry count
+# and by total byte size, since a single long low-WPM render can be worth
+# several megabytes.
+_WAV_CACHE: "OrderedDict[tuple, bytes]" = OrderedDict()
+_WAV_CACHE_MAX_ENTRIES = 256
+_WAV_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_wav_cache_size = 0
+
+def _wav_cache_get(key: tuple):
+    """Returns the cached WAV bytes for key, or None."""
+    cached = _WAV_CACHE.get(key)
+    if cached is not None:
+        _WAV_CACHE.move_to_end(key)
+    return cached
+
+def _wav_cache_put(key: tuple, wav_bytes: bytes) -> None:
+    """Stores rendered WAV bytes, evicting least-recently-used entries."""
+    global _wav_cache_size
+
+    _WAV_CACHE[key] = wav_bytes
+    _wav_cache_size += len(wav_bytes)
+    while _WAV_CACHE and (len(_WAV_CACHE) > _WAV_CACHE_MAX_ENTRIES
+                          or _wav_cache_size > _WAV_CACHE_MAX_BYTES):
+        _, evicted = _WAV_CACHE.popitem(last=False)
+        _wav_cache_size -= len(evicted)
 
 # --- API Endpoint ---
 @app.post("/v1/audio/speech")
-async def create_speech(request: Request, body: SpeechRequest):
+async def create_speech(request: Request):
     """
     Generates Morse code audio based on the input text.
     Uses 'voice' to select WPM from VOICE_WPM_MAP, otherwise uses 'speed' multiplier.
     Mimics the OpenAI TTS API endpoint.
     """
-    print(f"Received request: Model={body.model}, Voice={body.voice}, Speed={body.speed}, Input='{body.input[:50]}...'")
+    body = _parse_speech_request(await request.body())
+    text = body["input"]
+    voice = body["voice"]
+    speed = body["speed"]
+    logger.info("Received request: Model=%s, Voice=%s, Speed=%s, Input length=%d", body["model"], voice, speed, len(text))
 
-    requested_voice = body.voice.lower() # Use lowercase for map lookup
+    # The model selects the output sample rate (unknown models use the default)
+    sample_rate = MODEL_SAMPLE_RATES.get(body["model"], SAMPLE_RATE)
+
+    requested_voice = voice.lower() # Use lowercase for map lookup
 
     # --- WPM Calculation Logic ---
     if requested_voice in VOICE_WPM_MAP:
         # Voice found in map: Use the mapped WPM directly, ignore the 'speed' parameter
         effective_wpm = VOICE_WPM_MAP[requested_voice]
-        print(f"Using WPM {effective_wpm} based on mapped voice '{body.voice}'. Ignoring speed parameter.")
+        logger.info("Using WPM %s based on mapped voice '%s'. Ignoring speed parameter.", effective_wpm, voice)
     else:
         # Voice not found in map: Use the default BASE_WPM multiplied by the 'speed' parameter
-        effective_wpm = BASE_WPM * body.speed
-        print(f"Voice '{body.voice}' not mapped. Using default BASE_WPM ({BASE_WPM}) * speed ({body.speed}) = {effective_wpm:.2f} WPM.")
+        effective_wpm = BASE_WPM * speed
+        logger.info("Voice '%s' not mapped. Using default BASE_WPM (%s) * speed (%s) = %.2f WPM.", voice, BASE_WPM, speed, effective_wpm)
     # --- End WPM Calculation Logic ---
 
 
     # Ensure WPM is valid before passing to generation function
     if effective_wpm <= 0:
-        print(f"Warning: Calculated WPM ({effective_wpm:.2f}) is invalid. Falling back to BASE_WPM ({BASE_WPM}).")
+        logger.warning("Calculated WPM (%.2f) is invalid. Falling back to BASE_WPM (%s).", effective_wpm, BASE_WPM)
         effective_wpm = BASE_WPM # Fallback to prevent errors
 
-    try:
-        start_time = time.time()
-        wav_bytes = generate_morse_wav(
-            text=body.input,
-            wpm=effective_wpm, # Pass the determined WPM
-            freq=FREQUENCY,
-            sample_rate=SAMPLE_RATE,
-            amplitude=AMPLITUDE
-        )
-        end_time = time.time()
-        print(f"Generated {len(wav_bytes)} bytes of WAV audio in {end_time - start_time:.3f} seconds at {effective_wpm:.2f} WPM.")
-
-        if not wav_bytes:
-             raise HTTPException(status_code=400, detail="Could not generate audio. Input might be empty or contain only unsupported characters.")
-
-        # Return WAV audio
+    # Fast path: if nothing in the input can render (empty, whitespace-only
+    # or all-unknown characters), reject before touching the cache, timing
+    # tables or encoder.
+    if not any(c in MORSE_CODE_DICT and c != ' ' for c in text.upper()):
+        raise HTTPException(status_code=400, detail="Could not generate audio. Input might be empty or contain only unsupported characters.")
+
+    # Cache hit: the full WAV is already rendered, return it outright
+    cache_key = (text, effective_wpm, FREQUENCY, sample_rate, AMPLITUDE)
+    wav_bytes = _wav_cache_get(cache_key)
+    if wav_bytes is not None:
+        logger.info("Returning %d bytes of cached WAV audio at %.2f WPM.", len(wav_bytes), effective_wpm)
         return Response(content=wav_bytes, media_type="audio/wav")
 
-    except Exception as e:
-        print(f"Error generating Morse code audio: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
+    # Encode and size the output up front: invalid input still gets a clean
+    # 400 (a streamed response cannot change its status code mid-flight),
+    # and the WAV header can carry the exact data size.
+    chunks = _encode_symbol_chunks(text)
+    lengths = _get_tables(effective_wpm, sample_rate)
+    total_samples = sum(int(lengths[chunk].sum()) for chunk in chunks)
+    if total_samples == 0:
+        raise HTTPException(status_code=400, detail="Could not generate audio. Input might be empty or contain only unsupported characters.")
+
+    start_time = time.time()
+    loop = asyncio.get_running_loop()
+
+    # Stream the header immediately, then one PCM chunk per character, so
+    # clients can start playback long before the full render finishes.
+    async def wav_stream():
+        header = _wav_header(total_samples, sample_rate)
+        parts = [header]
+        yield header
+        for chunk in chunks:
+            # The render is CPU-bound numpy/numba work; run it in the
+            # default executor so the event loop keeps servicing other
+            # requests mid-render (awaiting it also yields between chunks).
+            data = await loop.run_in_executor(
+                None, _render_chunk_cached, chunk, lengths, FREQUENCY, sample_rate, AMPLITUDE)
+            parts.append(data)
+            yield data
+        wav_bytes = b''.join(parts)
+        _wav_cache_put(cache_key, wav_bytes)
+        logger.info("Streamed %d bytes of WAV audio in %.3f seconds at %.2f WPM.", len(wav_bytes), time.time() - start_time, effective_wpm)
+
+    return StreamingResponse(wav_stream(), media_type="audio/wav")
 
 # --- Root Endpoint (Optional: for testing if the server is running) ---
+_ROOT_MESSAGE = {"message": "Morse Code TTS Server is running. POST to /v1/audio/speech"}
+
 @app.get("/")
 async def read_root():
-    return {"message": "Morse Code TTS Server is running. POST to /v1/audio/speech"}
+    return _ROOT_MESSAGE
 
 # --- Main Execution ---
 if __name__ == "__main__":
-    print("Starting Morse Code TTS Server...")
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Starting Morse Code TTS Server...")
     # NOTE: The host and port specified here in uvicorn.run() are ONLY used
     # if you run the script directly using: python morse_tts_server.py
     # If you run using `uvicorn morse_tts_server:app --port XXXX`,